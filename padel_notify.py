@@ -1,84 +1,154 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import concurrent.futures
 import csv
 import json
-import os
 import subprocess
 import re
 import sys
 import time
 from email.message import EmailMessage
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+import orjson
+from playwright.async_api import async_playwright
+
+import scraper_4padel as scraper
 
-CSV_PATH = Path("tournois_4padel.csv")
 STATE_PATH = Path(".padel_state.json")
-SCRAPER = Path("4padel.py")
 EMAIL_CONFIG_PATH = Path(".padel_email.json")
 
-ALLOWED_LEVELS = {"P100", "P250"}
+ALLOWED_LEVELS = scraper.ALLOWED_LEVELS
+Row = scraper.Row
+# Threads running the blocking SMTP sends; also caps the sends in flight
+MAX_CONCURRENT_EMAILS = 8
+EMAIL_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EMAILS)
 URL = "https://www.4padel.fr/tournois"
 
 
-def run_scraper() -> bool:
-    """Run the 4padel scraper to refresh the CSV. Returns True if success."""
-    if not SCRAPER.exists():
-        print(f"❌ Scraper introuvable: {SCRAPER}")
-        return False
+def csv_age_seconds() -> float | None:
+    """Age of the scraper CSV in seconds, or None if it does not exist."""
     try:
-        # Use the same Python interpreter
-        result = subprocess.run([sys.executable, str(SCRAPER)], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("❌ Échec exécution scraper:")
-            print(result.stdout)
-            print(result.stderr)
-            return False
-        # Optional: show brief output
-        print(result.stdout.strip())
-        return True
-    except Exception as e:
-        print(f"❌ Exception en lançant scraper: {e}")
-        return False
+        return time.time() - scraper.OUT.stat().st_mtime
+    except FileNotFoundError:
+        return None
 
 
-def load_csv() -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
-    if not CSV_PATH.exists():
-        print(f"ℹ️ CSV absent: {CSV_PATH}")
-        return rows
-    with CSV_PATH.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            rows.append(r)
+def load_csv() -> List[Row]:
+    """Read the CSV, keeping only P100/P250 rows in the same pass."""
+    with scraper.OUT.open("r", encoding="utf-8") as f:
+        return [
+            Row(
+                **{k: r.get(k) or "" for k in scraper.FIELDS},
+                sort_key=scraper.datetime_key(r.get("date") or "", r.get("heure") or ""),
+            )
+            for r in csv.DictReader(f)
+            if r.get("niveau", "").upper() in ALLOWED_LEVELS
+        ]
+
+
+async def run_scraper(
+    get_context: Callable[[], Awaitable[Any]],
+    min_age_seconds: float = 0,
+    debug: bool = False,
+) -> List[Row] | None:
+    """Scrape the tournaments in a new page and refresh the CSV.
+    If the CSV is younger than `min_age_seconds`, read it instead of scraping;
+    `get_context` (which launches the browser if needed) is only awaited otherwise.
+    Returns the rows, or None on failure."""
+    age = csv_age_seconds()
+    if age is not None and age < min_age_seconds:
+        print(f"ℹ️ CSV récent ({int(age)} s), scraping ignoré")
+        return load_csv()
+    try:
+        context = await get_context()
+        rows = await scraper.scrape(context, debug=debug)
+    except Exception as e:
+        print(f"❌ Échec exécution scraper: {e}")
+        return None
+    if rows:
+        scraper.write_csv(rows)
+        print(f"✅ CSV mis à jour: {scraper.OUT.resolve()} ({len(rows)} tournois)")
     return rows
 
 
-def filter_rows(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    return [r for r in rows if r.get("niveau", "").upper() in ALLOWED_LEVELS]
-
-
-def make_key(r: Dict[str, str]) -> Tuple[str, str, str, str]:
+def make_key(r: Row) -> Tuple[str, str, str, str]:
+    # club/date/heure repeat across many tournaments: intern them so keys share strings
     return (
-        r.get("club", ""),
-        r.get("date", ""),
-        r.get("heure", ""),
-        r.get("nom", ""),
+        sys.intern(r.club),
+        sys.intern(r.date),
+        sys.intern(r.heure),
+        r.nom,
     )
 
 
+def _is_key(x: Any) -> bool:
+    return isinstance(x, list) and len(x) == 4 and all(isinstance(v, str) for v in x)
+
+
 def load_state() -> Set[Tuple[str, str, str, str]]:
+    """Read the seen keys: one JSON array per line (append-only log).
+    The former format (a single indented JSON list) is still read; it is converted
+    by the next append_state() call, never here."""
     if not STATE_PATH.exists():
         return set()
     try:
-        data = json.loads(STATE_PATH.read_text(encoding="utf-8"))
-        return set(tuple(x) for x in data)
+        raw = STATE_PATH.read_bytes()
     except Exception:
         return set()
+    try:
+        data = orjson.loads(raw)
+        if isinstance(data, list) and all(isinstance(x, list) for x in data):
+            return set(tuple(x) for x in data if _is_key(x))
+    except ValueError:
+        pass
+    keys: Set[Tuple[str, str, str, str]] = set()
+    for line in raw.splitlines():
+        try:
+            x = orjson.loads(line)
+        except ValueError:
+            # Ligne vide ou tronquée (écriture interrompue): on l'ignore
+            continue
+        if _is_key(x):
+            keys.add(tuple(x))
+    return keys
+
+
+def _is_log_format() -> bool:
+    """True if the state file is empty or already in the one-key-per-line format."""
+    try:
+        with STATE_PATH.open("rb") as f:
+            head = f.read(2)
+    except FileNotFoundError:
+        return True
+    return not head or head == b'["'
+
+
+def _dump_keys(keys: Set[Tuple[str, str, str, str]]) -> bytes:
+    return b"".join(orjson.dumps(k, option=orjson.OPT_APPEND_NEWLINE) for k in sorted(keys))
 
 
 def save_state(keys: Set[Tuple[str, str, str, str]]) -> None:
-    data = [list(k) for k in sorted(keys)]
-    STATE_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    """Rewrite the whole state file (used by --init)."""
+    STATE_PATH.write_bytes(_dump_keys(keys))
+
+
+def append_state(new_keys: Set[Tuple[str, str, str, str]], all_keys: Set[Tuple[str, str, str, str]]) -> None:
+    """Append only the newly seen keys to the state log.
+    If the file is still in the former format, rewrite it once with `all_keys`."""
+    if not _is_log_format():
+        save_state(all_keys)
+        return
+    with STATE_PATH.open("a+b") as f:
+        # Si la dernière ligne a été tronquée, ne pas coller la suivante dessus
+        f.seek(0, 2)
+        if f.tell() > 0:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(_dump_keys(new_keys))
 
 def load_email_config() -> Dict[str, Any] | None:
     if not EMAIL_CONFIG_PATH.exists():
@@ -94,7 +164,8 @@ def load_email_config() -> Dict[str, Any] | None:
         print(f"⚠️ Impossible de lire .padel_email.json: {e}")
         return None
 
-def notify_email(config: Dict[str, Any], subject: str, body: str) -> bool:
+def _send_sync(config: Dict[str, Any], subject: str, body: str) -> bool:
+    """Blocking SMTP send; run it through notify_email() from async code."""
     import smtplib
 
     msg = EmailMessage()
@@ -135,26 +206,40 @@ def notify_email(config: Dict[str, Any], subject: str, body: str) -> bool:
         return False
 
 
-def notify_mac(title: str, message: str, subtitle: str = "") -> None:
+async def notify_email(config: Dict[str, Any], subject: str, body: str) -> bool:
+    # smtplib is blocking: delegate to a thread so the event loop keeps running
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EMAIL_POOL, _send_sync, config, subject, body)
+
+
+def _applescript_str(s: str) -> str:
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def notify_mac(title: str, messages: List[str], subtitle: str = "") -> None:
     # Use AppleScript via osascript for native macOS notifications
-    script = f'display notification "{message}" with title "{title}"' + (f' subtitle "{subtitle}"' if subtitle else "")
+    # One osascript process for the whole batch (one "display notification" per line)
+    suffix = f" with title {_applescript_str(title)}" + (f" subtitle {_applescript_str(subtitle)}" if subtitle else "")
+    script = "\n".join(f"display notification {_applescript_str(m)}{suffix}" for m in messages)
+    if not script:
+        return
     try:
         subprocess.run(["osascript", "-e", script], check=False)
     except Exception as e:
         print(f"⚠️ Impossible d'afficher la notification: {e}")
 
 
-def format_row(r: Dict[str, str]) -> str:
-    return f"{r.get('niveau')} {r.get('nom')} — {r.get('club')} le {r.get('date')} à {r.get('heure')}"
+def format_row(r: Row) -> str:
+    return f"{r.niveau} {r.nom} — {r.club} le {r.date} à {r.heure}"
 
 
-def is_evening(r: Dict[str, str], evening_hour: int = 16) -> bool:
+def is_evening(r: Row, evening_hour: int = 16) -> bool:
     """Return True if the tournament is in the evening.
     Criteria:
     - If 'heure' parses to hour >= 18
     - Fallback: 'nom' contains 'soir' (soirée/soir)
     """
-    h = (r.get("heure") or "").strip()
+    h = r.heure.strip()
     # Try to extract hour from common formats: "20:30", "20h30", "20 h", "20"
     # Take the first 1-2 digit number as hour
     m = re.search(r"\b(\d{1,2})\b", h)
@@ -166,35 +251,48 @@ def is_evening(r: Dict[str, str], evening_hour: int = 16) -> bool:
         except Exception:
             pass
     # Fallback on name keyword
-    name = (r.get("nom") or "").lower()
+    name = r.nom.lower()
     if "soir" in name:  # matches 'soir', 'soirée', etc.
         return True
     return False
 
 
-def check_once(dry_run: bool = False, send_email: bool = False, batch_email: bool = False) -> int:
+async def check_once(
+    get_context: Callable[[], Awaitable[Any]],
+    prev_keys: Set[Tuple[str, str, str, str]],
+    dry_run: bool = False,
+    send_email: bool = False,
+    batch_email: bool = False,
+    min_age_seconds: float = 0,
+    debug: bool = False,
+) -> int:
+    """Scrape, notify the tournaments absent from `prev_keys` and add them to it.
+    `prev_keys` is updated in place so the watch loop never reloads the state file."""
     # Refresh CSV from the scraper
-    ok = run_scraper()
-    if not ok:
+    rows = await run_scraper(get_context, min_age_seconds, debug)
+    if rows is None:
         return 0
 
-    rows = filter_rows(load_csv())
-    current_keys = set(make_key(r) for r in rows)
-    prev_keys = load_state()
-
-    new_keys = current_keys - prev_keys
-    new_rows = [r for r in rows if make_key(r) in new_keys]
+    # Rows are already restricted to P100/P250 by the scraper or load_csv()
+    # Single pass: hash each row once and keep those never seen before
+    new_rows: List[Row] = []
+    new_keys: Set[Tuple[str, str, str, str]] = set()
+    for r in rows:
+        k = make_key(r)
+        if k not in prev_keys and k not in new_keys:
+            new_keys.add(k)
+            new_rows.append(r)
 
     count = len(new_rows)
     if count == 0:
         print("✅ Aucun nouveau tournoi P100/P250")
     else:
         print(f"🆕 {count} nouveau(x) tournoi(x) P100/P250")
-        for r in new_rows:
-            msg = format_row(r)
+        messages = [format_row(r) for r in new_rows]
+        for msg in messages:
             print("-", msg)
-            if not dry_run:
-                notify_mac("Nouveau tournoi 4PADEL", msg)
+        if not dry_run:
+            notify_mac("Nouveau tournoi 4PADEL", messages)
 
         # Email notifications
         if send_email and not dry_run:
@@ -232,22 +330,83 @@ def check_once(dry_run: bool = False, send_email: bool = False, batch_email: boo
                     sections.append("")
                     sections.append(f"Page: {URL}")
                     body = "\n".join(sections)
-                    ok = notify_email(cfg, subject, body)
+                    ok = await notify_email(cfg, subject, body)
                     if ok:
                         print("📧 Email récapitulatif envoyé.")
                 else:
-                    for r in new_rows:
-                        subject = f"Nouveau tournoi 4PADEL: {r.get('niveau')} {r.get('nom')}"
+                    # One email per tournament, sent concurrently (EMAIL_POOL bounds it)
+                    async def send_one(r: Row) -> None:
+                        subject = f"Nouveau tournoi 4PADEL: {r.niveau} {r.nom}"
                         body = f"{greeting}\n\n" + format_row(r) + f"\n\nPage: {URL}"
-                        ok = notify_email(cfg, subject, body)
+                        ok = await notify_email(cfg, subject, body)
                         if ok:
                             print("📧 Email envoyé:", subject)
 
-    # Persist new state (union of previous and current to avoid regressions)
-    save_state(prev_keys | current_keys)
+                    await asyncio.gather(*[send_one(r) for r in new_rows])
+
+    # Persist new state (append-only: previous keys are never dropped)
+    if new_keys:
+        prev_keys |= new_keys
+        append_state(new_keys, prev_keys)
     return count
 
 
+async def run(args: argparse.Namespace) -> None:
+    # Un seul navigateur + contexte pour toute la durée de vie du process;
+    # chaque vérification ouvre simplement un nouvel onglet.
+    # Playwright/Chromium ne sont lancés qu'au premier scraping réel (pas si le CSV
+    # est assez récent pour --min-age), et relancés si Chromium a planté.
+    pw = None
+    browser = None
+    context = None
+
+    async def get_context():
+        nonlocal pw, browser, context
+        if browser is None or not browser.is_connected():
+            if browser is not None:
+                print("⚠️ Navigateur déconnecté, relance de Chromium.")
+            context = None
+            if pw is None:
+                pw = await async_playwright().start()
+            browser = await pw.chromium.launch(headless=True)
+        if context is None:
+            context = await scraper.new_context(browser)
+        return context
+
+    try:
+        min_age_seconds = args.min_age * 60
+
+        if args.init:
+            # Initialiser l'état à la liste actuelle sans notifier
+            rows = await run_scraper(get_context, min_age_seconds, args.debug)
+            if not rows:
+                # Aucun tournoi récupéré: ne pas écraser l'état existant
+                print("❌ Aucun tournoi récupéré, état inchangé.")
+                sys.exit(1)
+            current_keys = {make_key(r) for r in rows}
+            save_state(current_keys)
+            print(f"✅ État initialisé avec {len(current_keys)} tournois P100/P250")
+            return
+
+        # État chargé une seule fois puis maintenu en mémoire entre les vérifications
+        prev_keys = load_state()
+
+        if not args.watch:
+            await check_once(get_context, prev_keys, dry_run=args.dry_run, send_email=args.email, batch_email=args.batch_email, min_age_seconds=min_age_seconds, debug=args.debug)
+            return
+
+        # Watch mode
+        print(f"👀 Surveillance active toutes {args.interval} min. Appuyez sur Ctrl+C pour arrêter.")
+        while True:
+            await check_once(get_context, prev_keys, dry_run=args.dry_run, send_email=args.email, batch_email=args.batch_email, min_age_seconds=min_age_seconds, debug=args.debug)
+            await asyncio.sleep(max(1, args.interval * 60))
+    finally:
+        if browser is not None:
+            await browser.close()
+        if pw is not None:
+            await pw.stop()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Notifier les nouveaux tournois P100/P250 de 4PADEL")
     parser.add_argument("--watch", action="store_true", help="Boucle de surveillance continue")
@@ -256,29 +415,12 @@ def main():
     parser.add_argument("--init", action="store_true", help="Initialiser l'état sans notifier (enregistre les tournois courants)")
     parser.add_argument("--email", action="store_true", help="Envoyer des emails en plus des notifications macOS")
     parser.add_argument("--batch-email", action="store_true", help="Envoyer un email unique récapitulatif au lieu d'un email par tournoi")
+    parser.add_argument("--min-age", type=float, default=0, help="Réutiliser le CSV s'il a moins de N minutes au lieu de relancer le scraper (0 = toujours scraper)")
+    parser.add_argument("--debug", action="store_true", help="Enregistrer une capture d'écran de la page scrapée")
     args = parser.parse_args()
 
-    if args.init:
-        # Initialiser l'état à la liste actuelle sans notifier
-        ok = run_scraper()
-        if not ok:
-            sys.exit(1)
-        rows = filter_rows(load_csv())
-        current_keys = set(make_key(r) for r in rows)
-        save_state(current_keys)
-        print(f"✅ État initialisé avec {len(current_keys)} tournois P100/P250")
-        return
-
-    if not args.watch:
-        check_once(dry_run=args.dry_run, send_email=args.email, batch_email=args.batch_email)
-        return
-
-    # Watch mode
-    print(f"👀 Surveillance active toutes {args.interval} min. Appuyez sur Ctrl+C pour arrêter.")
     try:
-        while True:
-            check_once(dry_run=args.dry_run, send_email=args.email, batch_email=args.batch_email)
-            time.sleep(max(1, args.interval * 60))
+        asyncio.run(run(args))
     except KeyboardInterrupt:
         print("👋 Arrêt de la surveillance.")
 
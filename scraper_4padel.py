@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import csv
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple, Set
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+URL = "https://www.4padel.fr/tournois"
+OUT = Path("tournois_4padel.csv")
+# Cookies/localStorage sauvegardés après acceptation du bandeau cookies
+STORAGE_STATE = Path("padel_storage.json")
+ALLOWED_LEVELS = {"P100", "P250"}
+CARD_SELECTOR = ".lf-tournament-preview-container"
+# Ressources inutiles pour lire le texte des cartes (images, médias, polices), filtrées
+# par extension d’URL: seules ces requêtes passent par le handler Python, le document,
+# les scripts et les XHR partent directement. Les feuilles de style restent chargées:
+# innerText dépend du CSS, et les clés de dédoublonnage avec.
+# Attention: toute route Playwright désactive le cache HTTP du contexte; on l’accepte
+# car les ressources les plus lourdes (et les plus cachables) sont justement bloquées.
+BLOCKED_RESOURCES_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|bmp|mp4|webm|mp3|ogg|woff2?|ttf|otf|eot)(?:[?#]|$)",
+    re.IGNORECASE,
+)
+# Pages à scraper (une par club/recherche si besoin) et nombre max d’onglets simultanés
+URLS = [URL]
+MAX_CONCURRENT_PAGES = 4
+
+# Ex: "Le 09/01/2026 à 17h00"
+DATETIME_RE = re.compile(
+    r"\bLe\s+(?P<d>\d{2}/\d{2}/\d{4})\s+à\s+(?P<t>\d{1,2}h\d{2})\b",
+    re.IGNORECASE,
+)
+
+# Ligne entière contenant "Le " et " à " (n’importe où, dans n’importe quel ordre)
+# dans un bloc de lignes: pré-filtre avant DATETIME_RE
+_LE_RE = re.compile(r"^(?=.*Le )(?=.* à ).*$", re.MULTILINE)
+
+# Lecture groupée des cartes dans le navigateur (évite un aller-retour CDP par champ)
+CARDS_JS = """
+(sel) => Array.from(document.querySelectorAll(sel)).map(c => ({
+    level: (c.querySelector('.fft p')?.innerText || '').trim(),
+    club: (c.querySelector('p.lf-tournament-type')?.innerText || '').trim(),
+    dates: Array.from(c.querySelectorAll('p.lf-tournament-date')).map(p => p.innerText.trim()),
+}))
+"""
+
+@dataclass(slots=True, frozen=True)
+class Row:
+    """Un tournoi (une ligne du CSV)."""
+    niveau: str
+    club: str
+    nom: str
+    date: str
+    heure: str
+    format_ouverture: str
+    caracteristiques: str
+    # Clé de tri (année, mois, jour, heure, minute) calculée une fois à l’extraction;
+    # hors CSV et hors comparaison
+    sort_key: Tuple[int, int, int, int, int] = field(default=(0, 0, 0, 0, 0), compare=False, repr=False)
+
+# Colonnes du CSV
+FIELDS = ["niveau", "club", "nom", "date", "heure", "format_ouverture", "caracteristiques"]
+
+def normalize_time(t: str) -> str:
+    # "17h00" -> "17:00"
+    return t.replace("h", ":")
+
+async def click_cookies_best_effort(page) -> bool:
+    """Accepte le bandeau cookies s’il est présent. Renvoie True si un bouton a été cliqué."""
+    for label in ["Tout accepter", "Accepter", "J'accepte", "Accept", "Agree", "OK"]:
+        try:
+            btn = page.get_by_role("button", name=label)
+            if await btn.count() > 0:
+                await btn.first.click(timeout=1500)
+                return True
+        except Exception:
+            pass
+    return False
+
+async def extract_cards(page) -> List[Row]:
+    """
+    Extrait les cartes .lf-tournament-preview-container en s’appuyant sur les classes
+    que tu as fournies.
+    """
+    # Un seul aller-retour Python <-> navigateur : on lit toutes les cartes côté JS
+    #   niveau (ex: P100)         – <div class="fft"><p>...</p></div>
+    #   club (ex: 4PADEL Marville) – <p class="lf-tournament-type">
+    #   bloc(s) date              – <p class="lf-tournament-date"> ... </p>
+    data = await page.evaluate(CARDS_JS, CARD_SELECTOR)
+    rows: List[Row] = []
+
+    for card in data:
+        # niveau/club reviennent sur beaucoup de cartes: une seule copie en mémoire
+        level = sys.intern(card["level"])
+        club = sys.intern(card["club"])
+        date_texts: List[str] = card["dates"]
+
+        # D’après ton exemple:
+        #   [0] "P100 Soirée"      -> nom court (souvent)
+        #   [1] "Le 09/01/2026..." -> date/heure
+        #   [2] "Soirée - Ouvert..." -> format/ouverture (parfois)
+        name = date_texts[0] if len(date_texts) >= 1 else ""
+        format_ouverture = ""
+
+        # Cherche la première ligne "Le .. à .." en une seule passe regex sur le bloc
+        # complet, puis n’applique DATETIME_RE qu’à cette ligne
+        joined = "\n".join(date_texts)
+        le = _LE_RE.search(joined)
+        m = DATETIME_RE.search(joined, le.start(), le.end()) if le else None
+
+        date = ""
+        heure = ""
+        if m:
+            date = m.group("d")
+            heure = normalize_time(m.group("t"))
+
+        # Prend la dernière ligne non "Le .. à .." comme format/ouverture
+        # (et évite de reprendre le nom si on a déjà name)
+        rest = [t for t in date_texts if not _LE_RE.match(t)]
+        if rest and rest[-1] != name:
+            format_ouverture = rest[-1]
+
+        # Stocke la ligne brute “caractéristiques” pour garder l’info complète
+        # (tu pourras raffiner ensuite en colonnes séparées si tu veux)
+        caracteristiques = " | ".join([t for t in [name, format_ouverture] if t])
+
+        rows.append(Row(
+            niveau=level,
+            club=club,
+            nom=name,
+            date=date,
+            heure=heure,
+            format_ouverture=format_ouverture,
+            caracteristiques=caracteristiques,
+            sort_key=datetime_key(date, heure),
+        ))
+
+    return rows
+
+def dedupe(rows: List[Row]) -> List[Row]:
+    seen: Set[Tuple[str, str, str, str]] = set()
+    out: List[Row] = []
+    for r in rows:
+        key = (r.club, r.date, r.heure, r.nom)
+        if key not in seen:
+            seen.add(key)
+            out.append(r)
+    return out
+
+def datetime_key(date: str, heure: str) -> Tuple[int, int, int, int, int]:
+    """(année, mois, jour, heure, minute) à partir de "dd/mm/yyyy" et "hh:mm"."""
+    try:
+        dd, mm, yyyy = date.split("/")
+        y, m, d_ = int(yyyy), int(mm), int(dd)
+    except:
+        y, m, d_ = 0, 0, 0
+    try:
+        hh, mi = heure.split(":")
+        h, mn = int(hh), int(mi)
+    except:
+        h, mn = 0, 0
+    return (y, m, d_, h, mn)
+
+async def _abort(route) -> None:
+    await route.abort()
+
+async def new_context(browser):
+    """
+    Crée un contexte navigateur réutilisable entre plusieurs scrapes.
+    Recharge les cookies sauvegardés (STORAGE_STATE) pour ne plus voir le bandeau cookies
+    et bloque les images/médias/polices (BLOCKED_RESOURCES_RE).
+    """
+    context = await browser.new_context(
+        storage_state=str(STORAGE_STATE) if STORAGE_STATE.exists() else None,
+        geolocation={"latitude": 48.8566, "longitude": 2.3522},
+        permissions=["geolocation"],
+    )
+    await context.route(BLOCKED_RESOURCES_RE, _abort)
+    return context
+
+async def scrape_one(context, url: str, index: int = 0, debug: bool = False) -> Tuple[List[Row], bool]:
+    """
+    Scrape une page de tournois dans un nouvel onglet et renvoie les cartes brutes,
+    plus True si le bandeau cookies a été accepté dans cet onglet.
+    `index` distingue les captures des onglets lancés en parallèle
+    (debug_4padel_cards_<index>.png en mode debug, zone visible seulement).
+    """
+    accepted_cookies = False
+    page = await context.new_page()
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+
+        # Bandeau cookies: absent si STORAGE_STATE a été rechargé, on abandonne vite
+        try:
+            accepted_cookies = await asyncio.wait_for(click_cookies_best_effort(page), timeout=2.0)
+        except asyncio.TimeoutError:
+            pass
+
+        # Attendre que des cartes existent
+        try:
+            await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+        except:
+            shot = f"debug_4padel_no_cards_{index}.png"
+            await page.screenshot(path=shot, full_page=True)
+            print(f"❌ Aucune carte détectée sur {url}. Screenshot: {shot}")
+            return [], accepted_cookies
+
+        # Scroll pour charger davantage (lazy load): on attend que le nombre de cartes
+        # augmente après chaque scroll et on s’arrête dès qu’il est stable 2 fois de suite
+        cards = page.locator(CARD_SELECTOR)
+        prev = await cards.count()
+        stable = 0
+        iterations = 0
+        while stable < 2 and iterations < 20:
+            iterations += 1
+            await page.mouse.wheel(0, 4000)
+            try:
+                await page.wait_for_function(
+                    "([sel, prev]) => document.querySelectorAll(sel).length > prev",
+                    arg=[CARD_SELECTOR, prev],
+                    timeout=2000,
+                )
+            except PlaywrightTimeoutError:
+                pass
+            count = await cards.count()
+            stable = stable + 1 if count == prev else 0
+            prev = count
+
+        rows = await extract_cards(page)
+        if debug:
+            await page.screenshot(path=f"debug_4padel_cards_{index}.png")
+    finally:
+        await page.close()
+
+    return rows, accepted_cookies
+
+async def scrape(
+    context,
+    urls: List[str] = URLS,
+    concurrency: int = MAX_CONCURRENT_PAGES,
+    debug: bool = False,
+) -> List[Row]:
+    """
+    Scrape les pages de tournois (onglets en parallèle, au plus `concurrency` à la fois)
+    et renvoie les lignes P100/P250 dédoublonnées, triées par date/heure.
+    Le navigateur et le contexte restent ouverts (réutilisés en mode surveillance).
+    """
+    sem = asyncio.BoundedSemaphore(concurrency)
+
+    async def bounded(index: int, url: str) -> Tuple[List[Row], bool]:
+        async with sem:
+            return await scrape_one(context, url, index, debug)
+
+    results = await asyncio.gather(*[bounded(i, u) for i, u in enumerate(urls)])
+    rows = dedupe([r for page_rows, _ in results for r in page_rows])
+
+    # Sauvegarde unique des cookies, après tous les onglets (pas d’écritures concurrentes)
+    if any(accepted for _, accepted in results):
+        await context.storage_state(path=str(STORAGE_STATE))
+
+    # Filtrer uniquement P100 et P250 puis trier par date/heure
+    rows = [r for r in rows if r.niveau.upper() in ALLOWED_LEVELS]
+    rows.sort(key=lambda r: (r.sort_key, r.club, r.nom))
+
+    if not rows:
+        print("❌ 0 ligne après filtrage P100/P250.")
+        print("➡️ Relance avec --debug et regarde debug_4padel_cards_*.png")
+    return rows
+
+def write_csv(rows: List[Row]) -> None:
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    with OUT.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(FIELDS)
+        w.writerows(
+            (r.niveau, r.club, r.nom, r.date, r.heure, r.format_ouverture, r.caracteristiques)
+            for r in rows
+        )
+
+async def main(debug: bool = False):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await new_context(browser)
+            rows = await scrape(context, debug=debug)
+        finally:
+            await browser.close()
+
+    # N’écrit pas un CSV vide silencieusement
+    if not rows:
+        return
+
+    write_csv(rows)
+
+    print(f"✅ CSV créé: {OUT.resolve()} ({len(rows)} tournois)")
+    if debug:
+        print("📸 Debug: debug_4padel_cards_*.png")
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Scraper des tournois 4PADEL vers CSV")
+    parser.add_argument("--debug", action="store_true", help="Enregistrer une capture d'écran de la page scrapée")
+    args = parser.parse_args()
+    asyncio.run(main(debug=args.debug))
+
+if __name__ == "__main__":
+    cli()